@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     # Model Configuration (for reference - actual routing handled by Claude Code Router)
     max_tokens: int = 4096
     
+    # Streaming Configuration
+    stream_coalesce_ms: int = 10  # Max time consecutive text deltas are held before flushing
+    stream_coalesce_chars: int = 64  # Flush early once this much text is buffered
+    
     # Letta Configuration
     letta_api_key: str = ""
     letta_base_url: str = "https://api.letta.com"
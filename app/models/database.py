@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, String, Text, DateTime, JSON, Enum as SQLEnum
-from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, JSON, Enum as SQLEnum, Index, text, inspect
+from datetime import datetime, timezone
 import enum
 
 from app.config import settings
@@ -11,6 +11,10 @@ class Base(DeclarativeBase):
     pass
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class MemoryBlockTypeDB(enum.Enum):
     PERSONA = "persona"
     PREFERENCES = "preferences"
@@ -20,14 +24,34 @@ class MemoryBlockTypeDB(enum.Enum):
 
 class MemoryBlockDB(Base):
     __tablename__ = "memory_blocks"
+    __table_args__ = (
+        # Conflict target for upserts: one block per (type, key)
+        Index("uq_memory_blocks_type_key", "type", "key", unique=True),
+        # Serve `ORDER BY updated_at DESC` listings (optionally filtered by type) from the index
+        Index("ix_memory_blocks_type_updated_at", "type", text("updated_at DESC")),
+        Index("ix_memory_blocks_updated_at", text("updated_at DESC")),
+        # Trigram indexes let Postgres serve `ILIKE '%query%'` searches without a full scan
+        Index(
+            "ix_memory_blocks_value_trgm",
+            "value",
+            postgresql_using="gin",
+            postgresql_ops={"value": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_memory_blocks_key_trgm",
+            "key",
+            postgresql_using="gin",
+            postgresql_ops={"key": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(String, primary_key=True)
     type = Column(SQLEnum(MemoryBlockTypeDB), nullable=False)
     key = Column(String, nullable=False, index=True)
     value = Column(Text, nullable=False)
     extra_data = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=_utcnow)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
 
 
 class ConversationDB(Base):
@@ -45,9 +69,37 @@ engine = create_async_engine(settings.database_url, echo=settings.debug)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def _ensure_memory_block_indexes(sync_conn) -> None:
+    """Bring a memory_blocks table created by an older schema up to date.
+
+    create_all() skips tables that already exist, so indexes added to the model
+    later (including the (type, key) upsert target) are created here. Raises
+    RuntimeError if existing duplicates prevent the unique index from being created.
+    """
+    existing = {index["name"] for index in inspect(sync_conn).get_indexes("memory_blocks")}
+    if "uq_memory_blocks_type_key" not in existing:
+        # Older schemas allowed duplicate (type, key) rows; never drop user data to add the index
+        duplicates = sync_conn.execute(text(
+            "SELECT type, key FROM memory_blocks GROUP BY type, key HAVING COUNT(*) > 1"
+        )).all()
+        if duplicates:
+            shown = ", ".join(f"({row.type}, {row.key})" for row in duplicates[:10])
+            raise RuntimeError(
+                f"memory_blocks has {len(duplicates)} duplicated (type, key) pair(s): {shown}. "
+                "Merge or delete the duplicate rows, then restart to create the "
+                "uq_memory_blocks_type_key unique index."
+            )
+    for index in MemoryBlockDB.__table__.indexes:
+        if index.name not in existing:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_ensure_memory_block_indexes)
 
 
 async def get_db():
@@ -79,6 +79,13 @@ class WorkspaceFile(BaseModel):
     size: Optional[int] = None
     modified_at: Optional[datetime] = None
     children: Optional[List["WorkspaceFile"]] = None
+    omitted_count: Optional[int] = Field(
+        None,
+        description=(
+            "Set only on the placeholder that ends a truncated directory listing in "
+            "file trees: the number of entries left out. The placeholder is not a real file."
+        ),
+    )
 
 
 class ConversationHistory(BaseModel):
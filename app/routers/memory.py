@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+from datetime import datetime
 
 from app.models import MemoryBlock, MemoryBlockType
 from app.models.database import get_db
 from app.services import MemoryService
+from app.services.memory_service import MemoryConflictError
 
 router = APIRouter(prefix="/memory", tags=["memory"])
 
@@ -15,7 +17,10 @@ async def create_memory(
     db: AsyncSession = Depends(get_db),
 ):
     service = MemoryService(db)
-    return await service.create_memory(memory)
+    try:
+        return await service.create_memory(memory)
+    except MemoryConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.get("/", response_model=List[MemoryBlock])
@@ -23,10 +28,18 @@ async def list_memories(
     type: Optional[MemoryBlockType] = Query(None, description="Filter by memory type"),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[datetime] = Query(
+        None, description="updated_at of the last memory on the previous page (keyset pagination)"
+    ),
+    cursor_id: Optional[str] = Query(
+        None, description="id of the last memory on the previous page; breaks updated_at ties"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     service = MemoryService(db)
-    return await service.list_memories(block_type=type, limit=limit, offset=offset)
+    return await service.list_memories(
+        block_type=type, limit=limit, offset=offset, cursor=cursor, cursor_id=cursor_id
+    )
 
 
 @router.get("/context")
@@ -42,10 +55,19 @@ async def get_memory_context(
 async def search_memories(
     q: str = Query(..., description="Search query"),
     type: Optional[MemoryBlockType] = Query(None, description="Filter by memory type"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[datetime] = Query(
+        None, description="updated_at of the last memory on the previous page (keyset pagination)"
+    ),
+    cursor_id: Optional[str] = Query(
+        None, description="id of the last memory on the previous page; breaks updated_at ties"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     service = MemoryService(db)
-    results = await service.search_memories(query=q, block_type=type)
+    results = await service.search_memories(
+        query=q, block_type=type, limit=limit, cursor=cursor, cursor_id=cursor_id
+    )
     return results
 
 
@@ -71,15 +93,13 @@ async def update_memory(
 ):
     service = MemoryService(db)
     
-    existing = await service.get_memory(memory_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Memory not found")
-    
     updated = await service.update_memory(
         memory_id,
         value=memory.value,
         metadata=memory.metadata,
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Memory not found")
     
     return updated
 
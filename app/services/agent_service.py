@@ -4,14 +4,100 @@ Combines OpenRouter's model routing with Letta's persistent memory and learning.
 Based on: https://github.com/letta-ai/learning-sdk/blob/main/examples/claude_research_agent
 """
 
+import asyncio
 import os
-from typing import AsyncGenerator, Optional, List, Dict, Any
+import time
+from io import StringIO
+from typing import AsyncGenerator, AsyncIterator, Optional, List, Dict, Any
 from claude_agent_sdk import ClaudeSDKClient, ClaudeAgentOptions, AssistantMessage, TextBlock, ToolUseBlock
 from agentic_learning import learning
 
 from app.config import settings
 from app.models.schemas import ChatStreamEvent, ToolCall
 
+
+class _TextCoalescer:
+    """Buffers consecutive text deltas so they go out as a single SSE frame.
+
+    Buffered text is released once it reaches ``max_chars`` or has been held for
+    ``window_ms``; ``seconds_until_due`` tells the caller how long it may wait for
+    more text. Callers must flush before emitting any non-text event so the
+    stream order is preserved.
+    """
+
+    def __init__(self, window_ms: int, max_chars: int):
+        self._window = window_ms / 1000
+        self._max_chars = max_chars
+        self._buffer = StringIO()
+        self._started_at: Optional[float] = None
+
+    def add(self, text: str) -> Optional[str]:
+        """Buffer text, returning the coalesced chunk if it is ready to send."""
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._buffer.write(text)
+        if self._buffer.tell() >= self._max_chars:
+            return self.flush()
+        return self.flush_if_due()
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Time left before buffered text must be sent, or None if nothing is buffered."""
+        if self._started_at is None:
+            return None
+        return max(0.0, self._window - (time.monotonic() - self._started_at))
+
+    def flush_if_due(self) -> Optional[str]:
+        """Flush only if the oldest buffered text has waited a full window."""
+        if self._started_at is None or time.monotonic() - self._started_at < self._window:
+            return None
+        return self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Return and clear everything buffered so far."""
+        if self._started_at is None:
+            return None
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._started_at = None
+        return text or None
+
+
+def _content_delta(text: str) -> ChatStreamEvent:
+    return ChatStreamEvent(event_type="content_delta", data={"text": text})
+
+
+async def _next_message(messages: AsyncIterator[Any]) -> Any:
+    return await messages.__anext__()
+
+
+async def _receive_until_due(
+    messages: AsyncIterator[Any], coalescer: _TextCoalescer
+) -> AsyncGenerator[Optional[Any], None]:
+    """Yield SDK messages, or None when buffered text falls due before the next one arrives.
+
+    The pending receive is left running across a timeout so no message is lost.
+    """
+    next_message: Optional[asyncio.Task] = None
+    try:
+        while True:
+            if next_message is None:
+                next_message = asyncio.ensure_future(_next_message(messages))
+            done, _ = await asyncio.wait({next_message}, timeout=coalescer.seconds_until_due())
+            if not done:
+                yield None
+                continue
+            finished, next_message = next_message, None
+            try:
+                msg = finished.result()
+            except StopAsyncIteration:
+                return
+            yield msg
+    finally:
+        if next_message is not None:
+            next_message.cancel()
+
+
 class AgentService:
     """Agent service using Claude Agent SDK with OpenRouter and Letta Learning SDK.
 
@@ -113,6 +199,9 @@ class AgentService:
             data={"message": "Thinking..."}
         )
         
+        # Small TextBlocks are merged to cut SSE frames and socket writes
+        coalescer = _TextCoalescer(settings.stream_coalesce_ms, settings.stream_coalesce_chars)
+        
         try:
             # Wrap Claude Agent SDK in Letta learning context for memory persistence
             # ClaudeInterceptor will automatically inject memory from Letta into system prompt
@@ -137,12 +226,23 @@ class AgentService:
                     await client.query(prompt=message)
                     
                     captured_session_id = None
-                    async for msg in client.receive_response():
+                    responses = client.receive_response()
+                    async for msg in _receive_until_due(responses, coalescer):
+                        if msg is None:
+                            # Buffered text waited a full window; don't hold it for the next message
+                            pending = coalescer.flush()
+                            if pending:
+                                yield _content_delta(pending)
+                            continue
+                        
                         # Capture session ID from system init message
                         # Python SDK: SystemMessage has subtype='init' and data={'session_id': '...'}
                         from claude_agent_sdk import SystemMessage
                         if isinstance(msg, SystemMessage) and msg.subtype == 'init':
                             if 'session_id' in msg.data:
+                                pending = coalescer.flush()
+                                if pending:
+                                    yield _content_delta(pending)
                                 captured_session_id = msg.data['session_id']
                                 print(f"[SESSION] Captured session ID: {captured_session_id}")
                                 yield ChatStreamEvent(
@@ -153,12 +253,15 @@ class AgentService:
                         if isinstance(msg, AssistantMessage):
                             for block in msg.content:
                                 if isinstance(block, TextBlock):
-                                    yield ChatStreamEvent(
-                                        event_type="content_delta",
-                                        data={"text": block.text}
-                                    )
+                                    ready = coalescer.add(block.text)
+                                    if ready:
+                                        yield _content_delta(ready)
                                 
                                 elif isinstance(block, ToolUseBlock):
+                                    pending = coalescer.flush()
+                                    if pending:
+                                        yield _content_delta(pending)
+                                    
                                     tool_call = ToolCall(
                                         id=block.id,
                                         name=block.name,
@@ -179,12 +282,19 @@ class AgentService:
                                         data={"tool_call": tool_call.model_dump()}
                                     )
                     
+                    pending = coalescer.flush()
+                    if pending:
+                        yield _content_delta(pending)
+                    
                     yield ChatStreamEvent(
                         event_type="message_stop",
                         data={"stop_reason": "end_turn"}
                     )
         
         except Exception as e:
+            pending = coalescer.flush()
+            if pending:
+                yield _content_delta(pending)
             yield ChatStreamEvent(
                 event_type="error",
                 data={"error": str(e), "type": type(e).__name__}
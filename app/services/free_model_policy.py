@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import httpx
 
@@ -60,6 +61,11 @@ class OpenRouterModel:
     context_length: Optional[int]
     description: Optional[str]
     raw: Dict[str, Any]
+    # Precomputed ordering for free-model listings: longest context first, then ID.
+    _sort_key: Tuple[int, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_sort_key", (-(self.context_length or 0), self.id))
 
     def is_free(self) -> bool:
         """Return True if all known pricing entries are zero-equivalent."""
@@ -75,6 +81,31 @@ def _price_is_zero(value: Any) -> bool:
         return False
 
 
+_SORT_KEY = attrgetter("_sort_key")
+
+
+def parse_models(entries: Iterable[Any]) -> List[OpenRouterModel]:
+    """Build models from raw OpenRouter catalog entries, skipping malformed ones."""
+    models: List[OpenRouterModel] = []
+    for entry in entries:
+        if not isinstance(entry, Dict):
+            continue
+        pricing = entry.get("pricing") or {}
+        top_provider = entry.get("top_provider") or {}
+        model = OpenRouterModel(
+            id=entry.get("id") or entry.get("canonical_slug"),
+            name=entry.get("name"),
+            pricing=pricing,
+            provider=top_provider.get("name"),
+            context_length=entry.get("context_length") or top_provider.get("context_length"),
+            description=entry.get("description"),
+            raw=entry,
+        )
+        if model.id:
+            models.append(model)
+    return models
+
+
 class FreeModelPolicyService:
     """Service responsible for fetching OpenRouter model metadata and validating pricing."""
 
@@ -90,6 +121,8 @@ class FreeModelPolicyService:
         self.endpoint = endpoint
         self._cache: Optional[List[OpenRouterModel]] = None
         self._cache_expiry: Optional[datetime] = None
+        self._free_models_cache: Optional[List[OpenRouterModel]] = None
+        self._free_models_source: Optional[List[OpenRouterModel]] = None
         self._lock = asyncio.Lock()
 
     async def fetch_models(self, *, force_refresh: bool = False) -> List[OpenRouterModel]:
@@ -107,11 +140,12 @@ class FreeModelPolicyService:
     async def list_free_models(self, *, force_refresh: bool = False) -> List[OpenRouterModel]:
         """Return all models whose pricing is effectively zero."""
         models = await self.fetch_models(force_refresh=force_refresh)
-        free_models = [model for model in models if model.is_free()]
-        return sorted(
-            free_models,
-            key=lambda model: (-(model.context_length or 0), model.id),
-        )
+        # Reuse the sorted list for as long as the underlying catalog is cached
+        if self._free_models_cache is None or self._free_models_source is not models:
+            free_models = [model for model in models if model.is_free()]
+            self._free_models_cache = sorted(free_models, key=_SORT_KEY)
+            self._free_models_source = models
+        return list(self._free_models_cache)
 
     async def get_model(self, model_id: str) -> OpenRouterModel:
         """Return metadata for a given model ID."""
@@ -154,24 +188,7 @@ class FreeModelPolicyService:
         if not isinstance(data, Sequence):
             raise OpenRouterAPIError("Malformed OpenRouter response: missing 'data' array")
 
-        models: List[OpenRouterModel] = []
-        for entry in data:
-            if not isinstance(entry, Dict):
-                continue
-            pricing = entry.get("pricing") or {}
-            top_provider = entry.get("top_provider") or {}
-            model = OpenRouterModel(
-                id=entry.get("id") or entry.get("canonical_slug"),
-                name=entry.get("name"),
-                pricing=pricing,
-                provider=top_provider.get("name"),
-                context_length=entry.get("context_length") or top_provider.get("context_length"),
-                description=entry.get("description"),
-                raw=entry,
-            )
-            if model.id:
-                models.append(model)
-
+        models = parse_models(data)
         if not models:
             raise OpenRouterAPIError("OpenRouter response did not include any models.")
 
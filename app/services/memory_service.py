@@ -1,12 +1,58 @@
+from collections import defaultdict
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, insert, update, delete, func, tuple_
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timezone
 import uuid
 
 from app.models.schemas import MemoryBlock, MemoryBlockType
 from app.models.database import MemoryBlockDB, MemoryBlockTypeDB
 
+# Single-character queries match nearly every block; two-character ones still search,
+# just without help from the Postgres trigram indexes
+MIN_SEARCH_QUERY_LENGTH = 2
+
+# Most recent blocks per type included in the memory context
+CONTEXT_BLOCKS_PER_TYPE = 20
+
+# Columns needed to build a MemoryBlock, selected without ORM entity overhead
+MEMORY_BLOCK_COLUMNS = (
+    MemoryBlockDB.id,
+    MemoryBlockDB.type,
+    MemoryBlockDB.key,
+    MemoryBlockDB.value,
+    MemoryBlockDB.extra_data,
+    MemoryBlockDB.created_at,
+    MemoryBlockDB.updated_at,
+)
+
+
+# Newest first; id breaks updated_at ties so keyset pages never skip or repeat rows
+KEYSET_ORDER = (MemoryBlockDB.updated_at.desc(), MemoryBlockDB.id.desc())
+
+
+class MemoryConflictError(ValueError):
+    """Raised when a created block's id or (type, key) is already taken."""
+
+    def __init__(self, memory: MemoryBlock) -> None:
+        super().__init__(
+            f"Memory '{memory.type.value}/{memory.key}' already exists; "
+            "use /memory/upsert to update it"
+        )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _before_cursor(cursor: datetime, cursor_id: Optional[str]):
+    # Without an id, "" sorts below every id, which reduces to updated_at < cursor
+    return tuple_(MemoryBlockDB.updated_at, MemoryBlockDB.id) < tuple_(cursor, cursor_id or "")
+
 
 class MemoryService:
     def __init__(self, db: AsyncSession):
@@ -15,6 +61,18 @@ class MemoryService:
     def _to_db_type(self, block_type: MemoryBlockType) -> MemoryBlockTypeDB:
         return MemoryBlockTypeDB(block_type.value)
     
+    def _from_row(self, row) -> MemoryBlock:
+        # Column rows come straight from the database, so skip Pydantic validation
+        return MemoryBlock.model_construct(
+            id=row.id,
+            type=MemoryBlockType(row.type.value),
+            key=row.key,
+            value=row.value,
+            metadata=row.extra_data,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+    
     def _from_db(self, db_block: MemoryBlockDB) -> MemoryBlock:
         return MemoryBlock(
             id=db_block.id,
@@ -28,20 +86,27 @@ class MemoryService:
     
     async def create_memory(self, memory: MemoryBlock) -> MemoryBlock:
         memory_id = memory.id or str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
         
-        db_block = MemoryBlockDB(
+        values = dict(
             id=memory_id,
             type=self._to_db_type(memory.type),
             key=memory.key,
             value=memory.value,
             extra_data=memory.metadata,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=now,
+            updated_at=now,
         )
         
-        self.db.add(db_block)
-        await self.db.commit()
-        await self.db.refresh(db_block)
+        try:
+            result = await self.db.execute(
+                insert(MemoryBlockDB).values(**values).returning(MemoryBlockDB)
+            )
+            db_block = result.scalar_one()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise MemoryConflictError(memory) from None
         
         return self._from_db(db_block)
     
@@ -73,19 +138,23 @@ class MemoryService:
         block_type: Optional[MemoryBlockType] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[datetime] = None,
+        cursor_id: Optional[str] = None,
     ) -> List[MemoryBlock]:
-        query = select(MemoryBlockDB)
+        query = select(*MEMORY_BLOCK_COLUMNS)
         
         if block_type:
             query = query.where(MemoryBlockDB.type == self._to_db_type(block_type))
+        if cursor:
+            # Keyset pagination: seek via the updated_at index instead of skipping rows
+            query = query.where(_before_cursor(cursor, cursor_id))
         
-        query = query.order_by(MemoryBlockDB.updated_at.desc())
+        query = query.order_by(*KEYSET_ORDER)
         query = query.limit(limit).offset(offset)
         
-        result = await self.db.execute(query)
-        db_blocks = result.scalars().all()
+        result = await self.db.stream(query.execution_options(yield_per=100))
         
-        return [self._from_db(block) for block in db_blocks]
+        return [self._from_row(row) async for row in result]
     
     async def update_memory(
         self, 
@@ -93,33 +162,62 @@ class MemoryService:
         value: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> Optional[MemoryBlock]:
-        update_data = {"updated_at": datetime.utcnow()}
+        update_data = {"updated_at": datetime.now(timezone.utc)}
         
         if value is not None:
             update_data["value"] = value
         if metadata is not None:
             update_data["extra_data"] = metadata
         
-        await self.db.execute(
+        stmt = (
             update(MemoryBlockDB)
             .where(MemoryBlockDB.id == memory_id)
             .values(**update_data)
         )
+        
+        result = await self.db.execute(
+            stmt.returning(MemoryBlockDB),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        )
+        db_block = result.scalar_one_or_none()
         await self.db.commit()
         
-        return await self.get_memory(memory_id)
+        return self._from_db(db_block) if db_block else None
+    
+    def _dialect_insert(self):
+        if self.db.bind.dialect.name == "postgresql":
+            return pg_insert
+        return sqlite_insert
     
     async def upsert_memory(self, memory: MemoryBlock) -> MemoryBlock:
-        existing = await self.get_memory_by_key(memory.type, memory.key)
+        now = datetime.now(timezone.utc)
+        upsert_insert = self._dialect_insert()
         
-        if existing:
-            return await self.update_memory(
-                existing.id,
-                value=memory.value,
-                metadata=memory.metadata
-            )
-        else:
-            return await self.create_memory(memory)
+        stmt = upsert_insert(MemoryBlockDB).values(
+            id=memory.id or str(uuid.uuid4()),
+            type=self._to_db_type(memory.type),
+            key=memory.key,
+            value=memory.value,
+            extra_data=memory.metadata,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["type", "key"],
+            set_={
+                "value": stmt.excluded.value,
+                "extra_data": stmt.excluded.extra_data,
+                "updated_at": now,
+            },
+        ).returning(MemoryBlockDB)
+        
+        result = await self.db.execute(
+            stmt, execution_options={"populate_existing": True}
+        )
+        db_block = result.scalar_one()
+        await self.db.commit()
+        
+        return self._from_db(db_block)
     
     async def delete_memory(self, memory_id: str) -> bool:
         result = await self.db.execute(
@@ -130,10 +228,29 @@ class MemoryService:
         return result.rowcount > 0
     
     async def get_memory_context(self) -> str:
+        # One query for every type: rank blocks within each type by recency
+        # and keep the newest CONTEXT_BLOCKS_PER_TYPE of each.
+        rn = func.row_number().over(
+            partition_by=MemoryBlockDB.type,
+            order_by=MemoryBlockDB.updated_at.desc(),
+        ).label("rn")
+        ranked = select(MemoryBlockDB, rn).subquery()
+        block = aliased(MemoryBlockDB, ranked)
+        
+        result = await self.db.execute(
+            select(block)
+            .where(ranked.c.rn <= CONTEXT_BLOCKS_PER_TYPE)
+            .order_by(ranked.c.type, ranked.c.rn)
+        )
+        
+        by_type: Dict[str, List[MemoryBlockDB]] = defaultdict(list)
+        for db_block in result.scalars():
+            by_type[db_block.type.value].append(db_block)
+        
         context_parts = []
         
         for block_type in MemoryBlockType:
-            memories = await self.list_memories(block_type=block_type, limit=20)
+            memories = by_type.get(block_type.value)
             
             if memories:
                 context_parts.append(f"### {block_type.value.title()}")
@@ -147,18 +264,30 @@ class MemoryService:
         self, 
         query: str,
         block_type: Optional[MemoryBlockType] = None,
+        limit: int = 50,
+        cursor: Optional[datetime] = None,
+        cursor_id: Optional[str] = None,
     ) -> List[MemoryBlock]:
-        sql_query = select(MemoryBlockDB).where(
-            MemoryBlockDB.value.ilike(f"%{query}%") |
-            MemoryBlockDB.key.ilike(f"%{query}%")
+        # Empty/whitespace queries would otherwise match every row
+        if len(query.strip()) < MIN_SEARCH_QUERY_LENGTH:
+            return []
+        
+        # Plain ILIKE (no lower()) so Postgres can use the trigram GIN indexes
+        pattern = f"%{_escape_like(query)}%"
+        sql_query = select(*MEMORY_BLOCK_COLUMNS).where(
+            MemoryBlockDB.value.ilike(pattern, escape="\\") |
+            MemoryBlockDB.key.ilike(pattern, escape="\\")
         )
         
         if block_type:
             sql_query = sql_query.where(
                 MemoryBlockDB.type == self._to_db_type(block_type)
             )
+        if cursor:
+            sql_query = sql_query.where(_before_cursor(cursor, cursor_id))
+        
+        sql_query = sql_query.order_by(*KEYSET_ORDER).limit(limit)
         
         result = await self.db.execute(sql_query)
-        db_blocks = result.scalars().all()
         
-        return [self._from_db(block) for block in db_blocks]
+        return [self._from_row(row) for row in result.all()]
@@ -1,43 +1,108 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from pathlib import Path
 from datetime import datetime
+import fnmatch
+import heapq
 import os
+import re
+import stat
 
 from app.config import settings
 from app.models.schemas import WorkspaceFile
 
+# Dependency/VCS directories that are never descended into
+_HIDDEN_DIRS = frozenset({"node_modules", "__pycache__", ".git", "venv", ".venv"})
+
+# Larger directories are truncated in file trees with a "... N more" placeholder,
+# marked by its omitted_count
+MAX_TREE_CHILDREN = 1000
+
+
+def _join_rel(rel_dir: str, name: str) -> str:
+    return name if rel_dir == "." else os.path.join(rel_dir, name)
+
+
+def _compile_glob(pattern: str) -> Callable[[str], bool]:
+    """Compile a glob once; like Path.match it is tested against the trailing path components."""
+    match = re.compile(fnmatch.translate(pattern)).match
+    depth = pattern.count("/") + 1
+    
+    def matches(rel_path: str) -> bool:
+        parts = rel_path.split(os.sep)
+        return match("/".join(parts[-depth:])) is not None
+    
+    return matches
+
 
 class WorkspaceService:
     def __init__(self, workspace_path: Optional[str] = None):
         self.workspace_path = Path(workspace_path or settings.workspace_path).resolve()
         self.workspace_path.mkdir(parents=True, exist_ok=True)
+        self._root_str = str(self.workspace_path)
+        self._root_prefix = os.path.join(self._root_str, "")
+    
+    def _is_inside(self, candidate: str) -> bool:
+        return candidate == self._root_str or candidate.startswith(self._root_prefix)
     
     def _resolve_path(self, path: str) -> Path:
-        resolved = (self.workspace_path / path).resolve()
-        if not str(resolved).startswith(str(self.workspace_path)):
+        # Lexical check first: rejects ".." escapes without touching the filesystem
+        candidate = os.path.normpath(os.path.join(self._root_str, path))
+        if candidate == self._root_str:
+            return self.workspace_path
+        if not self._is_inside(candidate):
+            raise ValueError(f"Path '{path}' is outside workspace")
+        
+        # Any component may be a symlink pointing elsewhere, so confirm the real path
+        resolved = os.path.realpath(candidate)
+        if not self._is_inside(resolved):
             raise ValueError(f"Path '{path}' is outside workspace")
-        return resolved
+        return Path(resolved)
     
     def _path_to_file(self, path: Path, include_children: bool = False) -> WorkspaceFile:
-        stat = path.stat()
+        # One stat call; the type checks are derived from st_mode
+        st = path.stat()
+        is_directory = stat.S_ISDIR(st.st_mode)
         
         file = WorkspaceFile(
             path=str(path.relative_to(self.workspace_path)),
             name=path.name,
-            is_directory=path.is_dir(),
-            size=stat.st_size if path.is_file() else None,
-            modified_at=datetime.fromtimestamp(stat.st_mtime),
+            is_directory=is_directory,
+            size=st.st_size if stat.S_ISREG(st.st_mode) else None,
+            modified_at=datetime.fromtimestamp(st.st_mtime),
         )
         
-        if include_children and path.is_dir():
+        if include_children and is_directory:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
             file.children = [
-                self._path_to_file(child, include_children=False)
-                for child in sorted(path.iterdir())
-                if not child.name.startswith(".")
+                self._entry_to_file(entry, _join_rel(file.path, entry.name))
+                for entry in entries
+                if not entry.name.startswith(".")
             ]
         
         return file
     
+    def _entry_to_file(self, entry: os.DirEntry, rel_path: str) -> WorkspaceFile:
+        # One stat per entry, following symlinks so links report their target's
+        # type and size; a dangling link falls back to the link itself
+        try:
+            st = entry.stat()
+        except OSError:
+            st = entry.stat(follow_symlinks=False)
+        is_directory = stat.S_ISDIR(st.st_mode)
+        
+        return WorkspaceFile(
+            path=rel_path,
+            name=entry.name,
+            is_directory=is_directory,
+            size=st.st_size if stat.S_ISREG(st.st_mode) else None,
+            modified_at=datetime.fromtimestamp(st.st_mtime),
+        )
+    
+    def _can_descend(self, entry: os.DirEntry) -> bool:
+        # Linked directories are only expanded when they resolve inside the workspace
+        return not entry.is_symlink() or self._is_inside(os.path.realpath(entry.path))
+    
     def get_file_tree(
         self, 
         path: str = ".",
@@ -58,40 +123,82 @@ class WorkspaceService:
         include_hidden: bool,
         current_depth: int,
     ) -> WorkspaceFile:
-        stat = path.stat()
+        st = path.stat()
+        is_directory = stat.S_ISDIR(st.st_mode)
         
         file = WorkspaceFile(
             path=str(path.relative_to(self.workspace_path)) if path != self.workspace_path else ".",
             name=path.name or "workspace",
-            is_directory=path.is_dir(),
-            size=stat.st_size if path.is_file() else None,
-            modified_at=datetime.fromtimestamp(stat.st_mtime),
+            is_directory=is_directory,
+            size=st.st_size if stat.S_ISREG(st.st_mode) else None,
+            modified_at=datetime.fromtimestamp(st.st_mtime),
         )
         
-        if path.is_dir() and current_depth < max_depth:
-            children = []
-            try:
-                for child in sorted(path.iterdir()):
-                    if not include_hidden and child.name.startswith("."):
-                        continue
-                    if child.name in ("node_modules", "__pycache__", ".git", "venv", ".venv"):
-                        children.append(WorkspaceFile(
-                            path=str(child.relative_to(self.workspace_path)),
-                            name=child.name,
-                            is_directory=True,
-                            children=[]
-                        ))
-                    else:
-                        children.append(
-                            self._build_tree(child, max_depth, include_hidden, current_depth + 1)
-                        )
-            except PermissionError:
-                pass
-            
-            file.children = children
+        if is_directory and current_depth < max_depth:
+            file.children = self._build_children(
+                str(path), file.path, max_depth, include_hidden, current_depth + 1
+            )
         
         return file
     
+    def _build_children(
+        self,
+        dir_path: str,
+        rel_dir: str,
+        max_depth: int,
+        include_hidden: bool,
+        current_depth: int,
+    ) -> List[WorkspaceFile]:
+        # One readdir pass; the is_dir flag is computed once and reused as the sort key
+        try:
+            with os.scandir(dir_path) as it:
+                entries = [
+                    (not entry.is_dir(), entry.name.lower(), entry.name, entry)
+                    for entry in it
+                    if include_hidden or not entry.name.startswith(".")
+                ]
+        except PermissionError:
+            return []
+        
+        # Directories first, then case-insensitive by name; only the first
+        # MAX_TREE_CHILDREN entries of very large directories are ordered and returned.
+        hidden_count = max(len(entries) - MAX_TREE_CHILDREN, 0)
+        if hidden_count:
+            entries = heapq.nsmallest(MAX_TREE_CHILDREN, entries)
+        else:
+            entries.sort()
+        
+        children = []
+        for _, _, _, entry in entries:
+            rel_path = _join_rel(rel_dir, entry.name)
+            
+            if entry.name in _HIDDEN_DIRS:
+                children.append(WorkspaceFile(
+                    path=rel_path,
+                    name=entry.name,
+                    is_directory=True,
+                    children=[]
+                ))
+                continue
+            
+            child = self._entry_to_file(entry, rel_path)
+            if child.is_directory and current_depth < max_depth and self._can_descend(entry):
+                child.children = self._build_children(
+                    entry.path, rel_path, max_depth, include_hidden, current_depth + 1
+                )
+            children.append(child)
+        
+        if hidden_count:
+            name = f"... {hidden_count} more"
+            children.append(WorkspaceFile(
+                path=_join_rel(rel_dir, name),
+                name=name,
+                is_directory=False,
+                omitted_count=hidden_count,
+            ))
+        
+        return children
+    
     def list_files(
         self, 
         path: str = ".",
@@ -106,18 +213,27 @@ class WorkspaceService:
         if not dir_path.is_dir():
             return [self._path_to_file(dir_path)]
         
+        matches = _compile_glob(pattern) if pattern else None
         files = []
         
-        if recursive:
-            glob_pattern = pattern or "*"
-            for item in dir_path.rglob(glob_pattern):
-                if not any(part.startswith(".") for part in item.parts):
-                    files.append(self._path_to_file(item))
-        else:
-            for item in dir_path.iterdir():
-                if not item.name.startswith("."):
-                    if pattern is None or item.match(pattern):
-                        files.append(self._path_to_file(item))
+        # Hidden directories are skipped during the walk instead of filtered afterwards
+        stack = [(str(dir_path), str(dir_path.relative_to(self.workspace_path)))]
+        while stack:
+            current, rel_dir = stack.pop()
+            try:
+                entries = os.scandir(current)
+            except PermissionError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    rel_path = _join_rel(rel_dir, entry.name)
+                    if matches is None or matches(rel_path):
+                        files.append(self._entry_to_file(entry, rel_path))
+                    # Linked directories are listed but not walked, so link cycles cannot loop
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, rel_path))
         
         return sorted(files, key=lambda f: (not f.is_directory, f.name.lower()))
     
@@ -126,17 +242,27 @@ class WorkspaceService:
         total_dirs = 0
         total_size = 0
         
-        for item in self.workspace_path.rglob("*"):
-            if any(part.startswith(".") for part in item.relative_to(self.workspace_path).parts):
-                continue
-            if item.name in ("node_modules", "__pycache__", "venv", ".venv"):
+        # Explicit scandir stack: DirEntry carries the file type from readdir,
+        # and hidden/dependency directories are pruned before descending.
+        stack = [str(self.workspace_path)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except (PermissionError, FileNotFoundError):
                 continue
-            
-            if item.is_file():
-                total_files += 1
-                total_size += item.stat().st_size
-            elif item.is_dir():
-                total_dirs += 1
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or entry.name in _HIDDEN_DIRS:
+                        continue
+                    # Links count as their target, like in listings, but linked
+                    # directories are not descended into
+                    if entry.is_dir():
+                        total_dirs += 1
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        total_files += 1
+                        total_size += entry.stat().st_size
         
         return {
             "total_files": total_files,
@@ -3,14 +3,15 @@
 Fetch OpenRouter generation details to identify the source of unexpected model calls.
 
 Usage:
-    python scripts/check_openrouter_generation.py <generation_id>
+    python scripts/check_openrouter_generation.py <generation_id> [<generation_id> ...]
     
-    # Or check multiple from CSV:
-    grep "claude-4.5-haiku" openrouter_activity_*.csv | cut -d',' -f1 | head -3 | xargs -I{} python scripts/check_openrouter_generation.py {}
+    # Or check multiple from CSV (fetched concurrently over one connection pool):
+    grep "claude-4.5-haiku" openrouter_activity_*.csv | cut -d',' -f1 | head -3 | xargs python scripts/check_openrouter_generation.py
 """
 
 import asyncio
 import os
+import re
 import sys
 import json
 from pathlib import Path
@@ -23,27 +24,47 @@ load_dotenv()
 import httpx
 
 
-async def fetch_generation(generation_id: str):
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+MAX_CONCURRENT_FETCHES = 10
+_PAID_RE = re.compile(r"haiku|sonnet", re.IGNORECASE)
+
+
+async def fetch_generation(client: httpx.AsyncClient, generation_id: str):
     """Fetch generation details from OpenRouter API."""
+    response = await client.get("/generation", params={"id": generation_id})
+    
+    if response.status_code != 200:
+        print(f"ERROR: API returned {response.status_code} for {generation_id}")
+        print(response.text)
+        return None
+    
+    return response.json()
+
+
+async def fetch_generations(generation_ids: list[str]):
+    """Fetch several generations concurrently over one shared client."""
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         print("ERROR: OPENROUTER_API_KEY not set")
         sys.exit(1)
     
-    url = f"https://openrouter.ai/api/v1/generation?id={generation_id}"
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url,
-            headers={"Authorization": f"Bearer {api_key}"}
-        )
+    async with httpx.AsyncClient(
+        base_url=OPENROUTER_API_BASE,
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=30.0,
+    ) as client:
+        async def fetch_one(generation_id: str):
+            async with semaphore:
+                try:
+                    return await fetch_generation(client, generation_id)
+                except httpx.HTTPError as e:
+                    # Report per id so one failed request doesn't abort the batch
+                    print(f"ERROR: request failed for {generation_id}: {e!r}")
+                    return None
         
-        if response.status_code != 200:
-            print(f"ERROR: API returned {response.status_code}")
-            print(response.text)
-            return None
-        
-        return response.json()
+        return await asyncio.gather(*(fetch_one(gid) for gid in generation_ids))
 
 
 def analyze_generation(data: dict):
@@ -97,7 +118,7 @@ def analyze_generation(data: dict):
     model = request.get('model', '')
     
     print("\nVERDICT:")
-    if 'haiku' in model.lower() or 'sonnet' in model.lower():
+    if _PAID_RE.search(model or ''):
         print(f"  ⚠️  PAID MODEL DETECTED: {model}")
         if referer:
             print(f"  📍 Source hint: {referer}")
@@ -110,21 +131,22 @@ def analyze_generation(data: dict):
 
 async def main():
     if len(sys.argv) < 2:
-        print("Usage: python scripts/check_openrouter_generation.py <generation_id>")
+        print("Usage: python scripts/check_openrouter_generation.py <generation_id> [<generation_id> ...]")
         print("\nExample:")
         print("  python scripts/check_openrouter_generation.py gen-1767116740-7lrapuv3INfw6BtjwpRq")
         sys.exit(1)
     
-    generation_id = sys.argv[1]
-    print(f"Fetching generation: {generation_id}")
+    generation_ids = sys.argv[1:]
+    print(f"Fetching {len(generation_ids)} generation(s): {', '.join(generation_ids)}")
     
-    data = await fetch_generation(generation_id)
-    if data:
-        analyze_generation(data)
-        
-        # Also dump raw JSON for further inspection
-        print("\n--- RAW JSON ---")
-        print(json.dumps(data, indent=2, default=str))
+    results = await fetch_generations(generation_ids)
+    for data in results:
+        if data:
+            analyze_generation(data)
+            
+            # Also dump raw JSON for further inspection
+            print("\n--- RAW JSON ---")
+            print(json.dumps(data, indent=2, default=str))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,542 @@
+"""
+Textual UI for browsing OpenRouter models, used by select_openrouter_model.py.
+
+Kept separate from the CLI so Textual is only imported when the selector is shown.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional
+
+from textual.app import App, ComposeResult
+from textual.containers import Horizontal, Vertical
+from textual.reactive import reactive
+from textual.timer import Timer
+from textual.widgets import Button, DataTable, Footer, Header, Input, Static, Switch
+
+from app.services.free_model_policy import OpenRouterModel
+
+
+LONG_CONTEXT_THRESHOLD = 100_000
+# Only rows near the viewport are pushed into the DataTable; the rest are appended on scroll
+MIN_ROW_PAGE = 50
+ROW_OVERSCAN = 20
+SEARCH_DEBOUNCE_SECONDS = 0.15
+
+SORT_LABELS = {
+    "context": "Sort: Context ↓ (S)",
+    "price_asc": "Sort: Price ↑ (S)",
+    "price_desc": "Sort: Price ↓ (S)",
+}
+# Sort keys per mode, built from a model and its cached (price, negated context) values
+SORT_KEYS: dict[str, Callable[[OpenRouterModel, float, int], tuple]] = {
+    "context": lambda model, price, neg_ctx: (neg_ctx, price, model.id),
+    "price_asc": lambda model, price, neg_ctx: (price, neg_ctx, model.id),
+    "price_desc": lambda model, price, neg_ctx: (-price, neg_ctx, model.id),
+}
+
+
+def format_price(pricing: dict[str, str]) -> str:
+    # Formatted strings are memoized by the (prompt, completion) pair
+    prompt = str(pricing.get("prompt") or "0")
+    completion = str(pricing.get("completion") or "0")
+    return _format_price_cached(prompt, completion)
+
+
+@lru_cache(maxsize=2048)
+def _format_price_cached(prompt: str, completion: str) -> str:
+    return f"{prompt}/{completion}"
+
+
+def price_value(pricing: dict[str, str]) -> Decimal:
+    try:
+        prompt = Decimal(str(pricing.get("prompt") or 0))
+        completion = Decimal(str(pricing.get("completion") or 0))
+    except (InvalidOperation, TypeError):
+        return Decimal("0")
+    return prompt + completion
+
+
+def price_sort_key(pricing: dict[str, str]) -> float:
+    # Only used for ordering, where float precision is plenty and much cheaper than Decimal
+    try:
+        return float(pricing.get("prompt") or 0) + float(pricing.get("completion") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def search_haystack(model: OpenRouterModel) -> str:
+    # Newlines keep a query from matching across field boundaries
+    return f"{model.id}\n{model.name or ''}\n{model.provider or ''}".lower()
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class ModelSelectorApp(App[Optional[OpenRouterModel]]):
+    """Textual UI that lists free OpenRouter models and allows selecting one."""
+
+    active_tab = reactive("free")
+    filter_long_context = reactive(False)
+    sort_mode = reactive("context")
+
+    CSS = """
+    Screen {
+        layout: vertical;
+    }
+
+    .toolbar-label {
+        padding-left: 1;
+        color: $text-muted;
+    }
+
+    #search {
+        dock: top;
+        padding: 1 2;
+        border: tall $primary;
+    }
+
+    #toolbar {
+        padding: 1;
+        border-bottom: solid $panel;
+        background: $surface;
+        align: center middle;
+    }
+
+    #toolbar > * {
+        margin-right: 1;
+    }
+
+    #filter_container {
+        align: center middle;
+    }
+
+    Button.tab {
+        margin-right: 1;
+        background: $surface;
+        color: $text-muted;
+    }
+
+    Button.tab.-active {
+        background: $primary;
+        color: $text;
+    }
+
+    #content {
+        height: 1fr;
+    }
+
+    #models {
+        width: 2fr;
+    }
+
+    #details {
+        width: 1fr;
+        border: tall $secondary;
+        padding: 1 2;
+    }
+
+    #status {
+        padding: 1;
+    }
+    """
+
+    BINDINGS = [
+        ("q", "quit", "Quit"),
+        ("enter", "select_model", "Select model"),
+        ("/", "focus_search", "Search"),
+        ("f", "show_free", "Free tab"),
+        ("p", "show_paid", "Paid tab"),
+        ("l", "toggle_long_context", "Filter ≥100k ctx"),
+        ("s", "cycle_sort", "Sort price/context"),
+    ]
+
+    def __init__(
+        self,
+        models: Optional[List[OpenRouterModel]] = None,
+        *,
+        loader: Optional[Callable[[], Awaitable[List[OpenRouterModel]]]] = None,
+    ) -> None:
+        super().__init__()
+        # When a loader is given the catalog is fetched after mount, overlapping UI startup
+        self._loader = loader
+        self.load_error: Optional[str] = None
+        self._set_models(models or [])
+        self._filtered_models: List[OpenRouterModel] = []
+        # Model ids currently in the table, in display order; ids double as row keys
+        self._row_ids: List[str] = []
+        self.selected_model: Optional[OpenRouterModel] = None
+        self._search_query: str = ""
+        self._search_timer: Optional[Timer] = None
+
+    def _set_models(self, models: List[OpenRouterModel]) -> None:
+        self._all_models = models
+        self._free_models: List[OpenRouterModel] = []
+        self._paid_models: List[OpenRouterModel] = []
+        self._free_haystacks: List[str] = []
+        self._paid_haystacks: List[str] = []
+        # Sort inputs are fixed per model, so compute them once instead of per sort
+        self._price_cache: dict[int, float] = {}
+        self._neg_ctx_cache: dict[int, int] = {}
+        self._models_by_id: dict[str, OpenRouterModel] = {}
+        # Trigram -> ids of models whose haystack contains it, to narrow longer searches
+        trigram_index: defaultdict[str, set[int]] = defaultdict(set)
+        # One pass over the catalog builds every per-model structure
+        for model in models:
+            model_key = id(model)
+            haystack = search_haystack(model)
+            if model.is_free():
+                self._free_models.append(model)
+                self._free_haystacks.append(haystack)
+            else:
+                self._paid_models.append(model)
+                self._paid_haystacks.append(haystack)
+            self._price_cache[model_key] = price_sort_key(model.pricing)
+            self._neg_ctx_cache[model_key] = -(model.context_length or 0)
+            self._models_by_id[model.id] = model
+            for gram in trigrams(haystack):
+                trigram_index[gram].add(model_key)
+        self._trigram_index = dict(trigram_index)
+        # Ordering depends only on (tab, sort mode, long-context filter), never on the search
+        self._sorted_cache: dict[tuple[str, str, bool], list[tuple[OpenRouterModel, str]]] = {}
+        self._rank_cache: dict[tuple[str, str, bool], dict[int, int]] = {}
+        # Rendered details markup per model id; rows are revisited as the cursor moves
+        self._details_cache: dict[str, str] = {}
+        self._last_rendered_model_id: Optional[str] = None
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield Input(placeholder="Press '/' to search free models...", id="search")
+        with Horizontal(id="toolbar"):
+            yield Button("Free Models (F)", id="tab_free", classes="tab")
+            yield Button("Paid Models (P)", id="tab_paid", classes="tab")
+            yield Button("Sort: Context ↓ (S)", id="sort_button")
+            with Horizontal(id="filter_container"):
+                yield Switch(id="filter_switch", value=False)
+                yield Static("≥100k ctx (L)", classes="toolbar-label")
+        with Horizontal(id="content"):
+            yield DataTable(id="models")
+            with Vertical(id="details"):
+                yield Static("Select a model to see details.", id="details_text")
+        yield Static("", id="status")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        # Resolve widgets once; the tree is static, so handlers can skip selector queries
+        self._table = self.query_one("#models", DataTable)
+        self._search = self.query_one("#search", Input)
+        self._details_text = self.query_one("#details_text", Static)
+        self._status = self.query_one("#status", Static)
+        self._tab_free = self.query_one("#tab_free", Button)
+        self._tab_paid = self.query_one("#tab_paid", Button)
+        self._sort_button = self.query_one("#sort_button", Button)
+        self._filter_switch = self.query_one("#filter_switch", Switch)
+
+        table = self._table
+        table.focus()
+        table.add_column("Model ID", key="id")
+        table.add_columns("Name", "Context", "Provider", "Prompt/Completion")
+        self.watch(table, "scroll_y", self._on_table_scroll, init=False)
+        self._search.display = False
+        self._update_tab_buttons()
+        self._update_sort_button()
+        if self._loader is not None:
+            self._update_status("Loading models…")
+            self.run_worker(self._load_models(), exclusive=True)
+        else:
+            self._show_models()
+
+    async def _load_models(self) -> None:
+        try:
+            models = await self._loader()
+        except Exception as exc:  # noqa: BLE001
+            self.load_error = f"Failed to fetch OpenRouter models: {exc}"
+            self.exit(None)
+            return
+        if not models:
+            self.load_error = "No OpenRouter models available for your account."
+            self.exit(None)
+            return
+        self._loader = None
+        self._set_models(models)
+        self._show_models()
+
+    def _show_models(self) -> None:
+        self._refresh_table()
+        self._update_status(
+            f"Loaded {len(self._free_models)} free models and {len(self._paid_models)} paid models."
+        )
+
+    def action_focus_search(self) -> None:
+        search = self._search
+        search.display = True
+        search.value = ""
+        self.set_focus(search)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "search":
+            event.input.blur()
+            event.input.display = False
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id != "search":
+            return
+        query = event.value.strip().lower()
+        if query == self._search_query:
+            return
+        self._search_query = query
+        # Rebuild once typing pauses rather than on every keystroke
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._update_status("Filtering…")
+        self._search_timer = self.set_timer(SEARCH_DEBOUNCE_SECONDS, self._run_search)
+
+    def _run_search(self) -> None:
+        self._search_timer = None
+        self._refresh_table()
+        if self._filtered_models:
+            self._update_status(f"{len(self._filtered_models)} models match.")
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        table = event.data_table
+        if not table.row_count:
+            return
+        self._fill_visible_rows()
+        model = self._model_for_row(event.row_key)
+        if model:
+            self.selected_model = model
+            self._render_details(model)
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        model = self._model_for_row(event.row_key)
+        if model:
+            self._finalize_selection(model)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "tab_free":
+            self.action_show_free()
+        elif event.button.id == "tab_paid":
+            self.action_show_paid()
+        elif event.button.id == "sort_button":
+            self.action_cycle_sort()
+
+    def on_switch_changed(self, event: Switch.Changed) -> None:
+        if event.switch.id == "filter_switch":
+            self.filter_long_context = event.value
+            self._refresh_table()
+
+    def on_resize(self, _event) -> None:
+        self._fill_visible_rows()
+
+    def _on_table_scroll(self, _scroll_y: float) -> None:
+        self._fill_visible_rows()
+
+    def watch_filter_long_context(self, value: bool) -> None:
+        self._filter_switch.value = value
+        self._refresh_table()
+
+    def watch_sort_mode(self, _: str) -> None:
+        self._update_sort_button()
+        self._refresh_table()
+
+    def watch_active_tab(self, _: str) -> None:
+        self._update_tab_buttons()
+        self._refresh_table()
+
+    def action_show_free(self) -> None:
+        self.active_tab = "free"
+
+    def action_show_paid(self) -> None:
+        self.active_tab = "paid"
+
+    def action_toggle_long_context(self) -> None:
+        self.filter_long_context = not self.filter_long_context
+
+    def action_cycle_sort(self) -> None:
+        order = ["context", "price_asc", "price_desc"]
+        idx = order.index(self.sort_mode)
+        self.sort_mode = order[(idx + 1) % len(order)]
+
+    def _refresh_table(self) -> None:
+        models = self._apply_filters()
+        table = self._table
+        self._filtered_models = models
+        if not self._filtered_models:
+            table.clear()
+            self._row_ids = []
+            if self._loader is None:
+                self._update_status("No models matched your search.")
+            return
+        self._sync_rows(table, models[: self._visible_row_target(table)])
+        table.cursor_type = "row"
+        table.cursor_coordinate = (0, 0)
+        self._render_details(self._filtered_models[0])
+
+    def _sync_rows(self, table: DataTable, window: List[OpenRouterModel]) -> None:
+        """Update the table to show ``window`` by removing, adding and reordering only what changed."""
+        new_ids = [model.id for model in window]
+        keep = set(new_ids)
+        stale = [row_id for row_id in self._row_ids if row_id not in keep]
+        # remove_row is linear in the row count, so rebuild when most rows are going away
+        if len(stale) > len(keep):
+            table.clear()
+            current: List[str] = []
+        else:
+            for row_id in stale:
+                table.remove_row(row_id)
+            current = [row_id for row_id in self._row_ids if row_id in keep]
+        present = set(current)
+        for model in window:
+            if model.id not in present:
+                self._add_model_row(table, model)
+                current.append(model.id)
+        if current != new_ids:
+            position = {row_id: idx for idx, row_id in enumerate(new_ids)}
+            table.sort("id", key=position.__getitem__)
+        self._row_ids = new_ids
+
+    def _fill_visible_rows(self) -> None:
+        """Append rows until the viewport (plus overscan) is covered."""
+        loaded = len(self._row_ids)
+        if loaded >= len(self._filtered_models):
+            return
+        table = self._table
+        for model in self._filtered_models[loaded : self._visible_row_target(table)]:
+            self._add_model_row(table, model)
+            self._row_ids.append(model.id)
+
+    def _visible_row_target(self, table: DataTable) -> int:
+        visible_end = int(table.scroll_y) + max(table.size.height, MIN_ROW_PAGE)
+        target = max(visible_end, table.cursor_row + 1) + ROW_OVERSCAN
+        return min(target, len(self._filtered_models))
+
+    def _add_model_row(self, table: DataTable, model: OpenRouterModel) -> None:
+        table.add_row(
+            model.id,
+            model.name or "—",
+            f"{model.context_length or '—'} tokens",
+            model.provider or "—",
+            format_price(model.pricing),
+            key=model.id,
+        )
+
+    def _model_for_row(self, row_key) -> Optional[OpenRouterModel]:
+        return self._models_by_id.get(getattr(row_key, "value", None))
+
+    def _render_details(self, model: OpenRouterModel) -> None:
+        # Highlight events repeat for the same row (e.g. after each table refresh)
+        if model.id == self._last_rendered_model_id:
+            return
+        self._last_rendered_model_id = model.id
+        details = self._details_cache.get(model.id)
+        if details is None:
+            details = self._details_cache[model.id] = self._format_details(model)
+        self._details_text.update(details)
+
+    @staticmethod
+    def _format_details(model: OpenRouterModel) -> str:
+        parts = [
+            f"[b]{model.name or model.id}[/b]",
+            f"ID: [cyan]{model.id}[/cyan]",
+            f"Provider: {model.provider or 'Unknown'}",
+            f"Context Length: {model.context_length or 'Unknown'}",
+            "",
+            "Pricing:",
+        ]
+        pricing_start = len(parts)
+        parts.extend(
+            f"- {key.title()}: {value}"
+            for key, value in model.pricing.items()
+            if value not in (None, "")
+        )
+        if len(parts) == pricing_start:
+            parts.append("- None")
+        parts.extend(("", "Description:", model.description or "No description provided."))
+        return "\n".join(parts)
+
+    def action_select_model(self) -> None:
+        table = self._table
+        if not table.row_count:
+            return
+        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        model = self._model_for_row(row_key)
+        if model:
+            self._finalize_selection(model)
+
+    def _finalize_selection(self, model: OpenRouterModel) -> None:
+        self.selected_model = model
+        self.exit(model)
+
+    def action_quit(self) -> None:
+        self.exit(None)
+
+    def _update_status(self, message: str) -> None:
+        self._status.update(message)
+
+    def _update_tab_buttons(self) -> None:
+        self._tab_free.set_class(self.active_tab == "free", "-active")
+        self._tab_paid.set_class(self.active_tab == "paid", "-active")
+
+    def _update_sort_button(self) -> None:
+        self._sort_button.label = SORT_LABELS[self.sort_mode]
+
+    def _apply_filters(self) -> List[OpenRouterModel]:
+        ordered = self._sorted_models()
+        query = self._search_query
+        if not query:
+            return [model for model, _ in ordered]
+        if len(query) < 3:
+            return [model for model, haystack in ordered if query in haystack]
+        # Only models containing every trigram of the query can match; verify those in display order
+        ranks = self._sorted_ranks()
+        positions = sorted(ranks[key] for key in self._trigram_candidates(query) if key in ranks)
+        return [ordered[pos][0] for pos in positions if query in ordered[pos][1]]
+
+    def _trigram_candidates(self, query: str) -> set[int]:
+        postings = [self._trigram_index.get(gram) for gram in trigrams(query)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def _sorted_ranks(self) -> dict[int, int]:
+        """Map id(model) to its position in the current ordering."""
+        cache_key = self._ordering_key()
+        ranks = self._rank_cache.get(cache_key)
+        if ranks is None:
+            ranks = {id(model): pos for pos, (model, _) in enumerate(self._sorted_models())}
+            self._rank_cache[cache_key] = ranks
+        return ranks
+
+    def _ordering_key(self) -> tuple[str, str, bool]:
+        return (self.active_tab, self.sort_mode, self.filter_long_context)
+
+    def _sorted_models(self) -> list[tuple[OpenRouterModel, str]]:
+        """Return (model, haystack) pairs for the current tab, filter and sort mode."""
+        cache_key = self._ordering_key()
+        ordered = self._sorted_cache.get(cache_key)
+        if ordered is None:
+            if self.active_tab == "free":
+                pairs = zip(self._free_models, self._free_haystacks)
+            else:
+                pairs = zip(self._paid_models, self._paid_haystacks)
+            if self.filter_long_context:
+                pairs = (
+                    (model, haystack)
+                    for model, haystack in pairs
+                    if (model.context_length or 0) >= LONG_CONTEXT_THRESHOLD
+                )
+            sort_key = self._sort_key()
+            ordered = sorted(pairs, key=lambda pair: sort_key(pair[0]))
+            self._sorted_cache[cache_key] = ordered
+        return ordered
+
+    def _sort_key(self) -> Callable[[OpenRouterModel], tuple]:
+        key_fn = SORT_KEYS[self.sort_mode]
+        prices = self._price_cache
+        neg_ctx = self._neg_ctx_cache
+        return lambda model: key_fn(model, prices[id(model)], neg_ctx[id(model)])
@@ -8,15 +8,21 @@ All requests will have their model field rewritten to the free model.
 
 import os
 import json
+from contextlib import asynccontextmanager
+
 import httpx
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 from dotenv import load_dotenv
 
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
-app = FastAPI(title="OpenRouter Model Proxy")
+load_dotenv()
 
 # Configuration
 OPENROUTER_BASE = "https://openrouter.ai/api"
@@ -26,6 +32,65 @@ API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 print(f"[PROXY] Force model: {FORCE_MODEL}")
 print(f"[PROXY] API key set: {bool(API_KEY)}")
 
+# Path segments of model-bearing endpoints (chat/completions, completions, messages,
+# messages/count_tokens, ...); any POST with a JSON body is parsed as well
+_REWRITE_PATH_MARKERS = ("completions", "messages")
+
+# Per-connection headers that must not be relayed; content-length is recomputed downstream
+_HOP_BY_HOP = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+    "content-length",
+})
+
+# Never forwarded upstream: httpx sets its own Host and framing headers
+_REQUEST_EXCLUDED_HEADERS = _HOP_BY_HOP | {"host"}
+
+
+def _filter_hop_by_hop(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in _HOP_BY_HOP}
+
+
+def _should_rewrite(path: str, method: str, content_type: str = "") -> bool:
+    if method != "POST":
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "application/json" or media_type.endswith("+json"):
+        return True
+    return any(marker in path for marker in _REWRITE_PATH_MARKERS)
+
+
+def _loads(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for the proxy's lifetime so upstream connections (and TLS) are reused
+    app.state.client = httpx.AsyncClient(
+        timeout=httpx.Timeout(120.0),
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=128),
+    )
+    yield
+    await app.state.client.aclose()
+
+
+app = FastAPI(title="OpenRouter Model Proxy", lifespan=lifespan)
+
 
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy(request: Request, path: str):
@@ -34,73 +99,87 @@ async def proxy(request: Request, path: str):
     target_url = f"{OPENROUTER_BASE}/{path}"
     
     # Get headers, forward auth
-    headers = dict(request.headers)
-    headers.pop("host", None)
-    headers.pop("content-length", None)
+    headers = {
+        k: v for k, v in request.headers.items()
+        if k.lower() not in _REQUEST_EXCLUDED_HEADERS
+    }
     
     # Use our API key if Authorization header contains the proxy token
     if "authorization" in headers:
         # Replace with real OpenRouter key
         headers["authorization"] = f"Bearer {API_KEY}"
     
-    # Get body and rewrite model if present
-    body = await request.body()
-    original_model = None
+    is_streaming = False
     
-    if body and request.method == "POST":
-        try:
-            data = json.loads(body)
-            if "model" in data:
-                original_model = data["model"]
-                data["model"] = FORCE_MODEL
-                print(f"[PROXY] Rewrote model: {original_model} -> {FORCE_MODEL}")
-                body = json.dumps(data).encode()
-        except json.JSONDecodeError:
-            pass
+    if _should_rewrite(path, request.method, request.headers.get("content-type", "")):
+        # Buffer the body to parse it once, rewrite the model and read the stream flag
+        body = await request.body()
+        if body:
+            try:
+                data = _loads(body)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                is_streaming = bool(data.get("stream", False))
+                original_model = data.get("model")
+                if original_model and original_model != FORCE_MODEL:
+                    data["model"] = FORCE_MODEL
+                    print(f"[PROXY] Rewrote model: {original_model} -> {FORCE_MODEL}")
+                    body = _dumps(data)
+    elif "content-length" in request.headers or "transfer-encoding" in request.headers:
+        # Nothing to rewrite: stream the upload through without buffering it
+        if "content-length" in request.headers:
+            headers["content-length"] = request.headers["content-length"]
+        body = request.stream()
+    else:
+        body = None
     
-    # Check if streaming is requested
-    is_streaming = False
-    if body:
-        try:
-            data = json.loads(body)
-            is_streaming = data.get("stream", False)
-        except:
-            pass
+    client: httpx.AsyncClient = request.app.state.client
     
     if is_streaming:
-        # Handle streaming response - client must stay open during streaming
+        # Open the upstream stream here so its status and headers can be relayed as-is;
+        # raw (still encoded) bytes are passed through without decompressing them
+        upstream = await client.send(
+            client.build_request(
+                method=request.method,
+                url=target_url,
+                headers=headers,
+                content=body,
+                params=request.query_params,
+            ),
+            stream=True,
+        )
+        
         async def stream_response():
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                async with client.stream(
-                    method=request.method,
-                    url=target_url,
-                    headers=headers,
-                    content=body,
-                    params=request.query_params,
-                ) as response:
-                    async for chunk in response.aiter_bytes():
-                        yield chunk
+            try:
+                async for chunk in upstream.aiter_raw():
+                    yield chunk
+            finally:
+                await upstream.aclose()
         
+        # The generator's finally never runs if the client disconnects before streaming
+        # starts, so release the pooled connection afterwards too; aclose() is idempotent
         return StreamingResponse(
             stream_response(),
-            media_type="text/event-stream",
+            status_code=upstream.status_code,
+            headers=_filter_hop_by_hop(upstream.headers),
+            background=BackgroundTask(upstream.aclose),
         )
     else:
         # Handle regular response
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                content=body,
-                params=request.query_params,
-            )
-            
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-            )
+        response = await client.request(
+            method=request.method,
+            url=target_url,
+            headers=headers,
+            content=body,
+            params=request.query_params,
+        )
+        
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+        )
 
 
 if __name__ == "__main__":
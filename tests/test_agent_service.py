@@ -0,0 +1,149 @@
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from claude_agent_sdk import AssistantMessage, TextBlock, ToolUseBlock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.config import settings  # noqa: E402
+from app.services import agent_service  # noqa: E402
+from app.services.agent_service import AgentService, _TextCoalescer  # noqa: E402
+
+
+def text_message(text: str) -> AssistantMessage:
+    return AssistantMessage(content=[TextBlock(text=text)], model="test-model")
+
+
+@pytest.fixture
+def run_stream(monkeypatch):
+    """Run stream_chat against a scripted SDK client and return (events, log)."""
+    log = []
+
+    @asynccontextmanager
+    async def fake_learning(**_):
+        yield
+
+    def make_client(script):
+        class FakeClient:
+            def __init__(self, options):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def query(self, prompt):
+                pass
+
+            async def receive_response(self):
+                for delay, item in script:
+                    await asyncio.sleep(delay)
+                    if isinstance(item, Exception):
+                        raise item
+                    log.append(("sdk", item))
+                    yield item
+
+        return FakeClient
+
+    async def run(script, *, window_ms=10_000, max_chars=64):
+        monkeypatch.setattr(settings, "stream_coalesce_ms", window_ms)
+        monkeypatch.setattr(settings, "stream_coalesce_chars", max_chars)
+        monkeypatch.setattr(agent_service, "learning", fake_learning)
+        monkeypatch.setattr(agent_service, "ClaudeSDKClient", make_client(script))
+        service = AgentService.__new__(AgentService)
+        service.agent_name = "test-agent"
+        monkeypatch.setattr(service, "_get_agent_options", lambda: object(), raising=False)
+
+        events = []
+        async for event in service.stream_chat("hi"):
+            events.append(event)
+            log.append(("event", event.event_type, event.data.get("text")))
+        return events, log
+
+    return run
+
+
+def event_types(events):
+    return [event.event_type for event in events]
+
+
+def test_coalescer_flushes_when_size_reached():
+    coalescer = _TextCoalescer(window_ms=10_000, max_chars=6)
+
+    assert coalescer.add("abc") is None
+    assert coalescer.seconds_until_due() > 0
+    assert coalescer.add("def") == "abcdef"
+    assert coalescer.seconds_until_due() is None
+    assert coalescer.flush() is None
+
+
+def test_coalescer_flushes_when_window_elapsed():
+    coalescer = _TextCoalescer(window_ms=20, max_chars=1000)
+
+    assert coalescer.seconds_until_due() is None
+    assert coalescer.add("a") is None
+    assert coalescer.flush_if_due() is None
+    time.sleep(0.03)
+    assert coalescer.seconds_until_due() == 0
+    assert coalescer.flush_if_due() == "a"
+    assert coalescer.flush_if_due() is None
+
+
+@pytest.mark.asyncio
+async def test_stream_flushes_buffered_text_before_tool_use(run_stream):
+    tool_message = AssistantMessage(
+        content=[TextBlock(text="Let me check"), ToolUseBlock(id="t1", name="Read", input={})],
+        model="test-model",
+    )
+    events, _ = await run_stream([(0, text_message("Hi. ")), (0, tool_message)])
+
+    assert event_types(events)[2:] == [
+        "message_start",
+        "content_delta",
+        "tool_use_start",
+        "tool_use_stop",
+        "message_stop",
+    ]
+    assert events[3].data["text"] == "Hi. Let me check"
+
+
+@pytest.mark.asyncio
+async def test_stream_flushes_buffered_text_before_error(run_stream):
+    events, _ = await run_stream([(0, text_message("partial")), (0, RuntimeError("boom"))])
+
+    assert event_types(events)[-2:] == ["content_delta", "error"]
+    assert events[-2].data["text"] == "partial"
+    assert events[-1].data["error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_stream_flushes_remaining_text_at_end(run_stream):
+    events, _ = await run_stream([(0, text_message("a")), (0, text_message("b"))])
+
+    assert event_types(events)[-2:] == ["content_delta", "message_stop"]
+    assert events[-2].data["text"] == "ab"
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_hold_text_past_window(run_stream):
+    # The second message arrives long after the window; the first text must not wait for it
+    events, log = await run_stream(
+        [(0, text_message("Let me check that")), (0.5, text_message("Done."))],
+        window_ms=10,
+    )
+
+    assert [e.data["text"] for e in events if e.event_type == "content_delta"] == [
+        "Let me check that",
+        "Done.",
+    ]
+    first_delta = log.index(("event", "content_delta", "Let me check that"))
+    second_message = [i for i, entry in enumerate(log) if entry[0] == "sdk"][1]
+    assert first_delta < second_message
@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import sys
 from pathlib import Path
 
@@ -14,6 +15,7 @@ from app.services.free_model_policy import (  # noqa: E402
     ModelNotFoundError,
     MissingOpenRouterAPIKeyError,
     OpenRouterModel,
+    parse_models,
 )
 from scripts import select_openrouter_model  # noqa: E402
 
@@ -63,6 +65,39 @@ async def test_ensure_model_is_free(monkeypatch):
         await service.ensure_model_is_free("unknown/model")
 
 
+@pytest.mark.asyncio
+async def test_list_free_models_sorted_and_cached(monkeypatch):
+    service = FreeModelPolicyService(api_key="test-key", cache_ttl_seconds=300)
+    short = make_model("b/short", prompt_price="0", completion_price="0")
+    long_ctx = OpenRouterModel(
+        id="z/long",
+        name="z/long",
+        pricing={"prompt": "0", "completion": "0"},
+        provider="unit-test",
+        context_length=1_000_000,
+        description=None,
+        raw={"id": "z/long"},
+    )
+    tie = make_model("a/short", prompt_price="0", completion_price="0")
+    paid = make_model("paid/model", prompt_price="0.000001", completion_price="0")
+    calls = 0
+
+    async def fake_fetch(_self):
+        nonlocal calls
+        calls += 1
+        return [short, paid, long_ctx, tie]
+
+    monkeypatch.setattr(FreeModelPolicyService, "_fetch_from_api", fake_fetch)
+
+    first = await service.list_free_models()
+    assert [m.id for m in first] == ["z/long", "a/short", "b/short"]
+
+    first.clear()
+    second = await service.list_free_models()
+    assert [m.id for m in second] == ["z/long", "a/short", "b/short"]
+    assert calls == 1
+
+
 @pytest.mark.asyncio
 async def test_fetch_models_requires_api_key():
     service = FreeModelPolicyService(api_key="placeholder", cache_ttl_seconds=0)
@@ -71,24 +106,39 @@ async def test_fetch_models_requires_api_key():
         await service.fetch_models(force_refresh=True)
 
 
-def test_cli_updates_env(tmp_path, monkeypatch):
+@pytest.fixture
+def fake_selector(monkeypatch):
+    """Swap the Textual selector for a stand-in that loads like the app and picks the first model."""
+
+    class FakeSelector:
+        def __init__(self, models=None, *, loader=None):
+            self._loader = loader
+            self.load_error = None
+
+        def run(self):
+            try:
+                models = asyncio.run(self._loader())
+            except Exception as exc:  # noqa: BLE001
+                self.load_error = f"Failed to fetch OpenRouter models: {exc}"
+                return None
+            return models[0] if models else None
+
+    monkeypatch.setattr(select_openrouter_model, "_load_app_class", lambda: FakeSelector)
+    return FakeSelector
+
+
+def stub_load_models(monkeypatch, models):
+    async def fake_load_models(use_cache=True):
+        return models
+
+    monkeypatch.setattr(select_openrouter_model, "load_models", fake_load_models)
+
+
+def test_cli_updates_env(tmp_path, monkeypatch, fake_selector):
     env_file = tmp_path / ".env"
     args = argparse.Namespace(env_file=str(env_file), update_example=False, dry_run=False)
     selected_model = make_model("free/model", prompt_price="0", completion_price="0")
-
-    async def fake_list_free_models(*_, **__):
-        return [selected_model]
-
-    monkeypatch.setattr(
-        select_openrouter_model.free_model_policy_service,
-        "list_free_models",
-        fake_list_free_models,
-    )
-    monkeypatch.setattr(
-        select_openrouter_model.ModelSelectorApp,
-        "run",
-        lambda self: selected_model,
-    )
+    stub_load_models(monkeypatch, [selected_model])
 
     exit_code = select_openrouter_model.run_cli(args)
     assert exit_code == 0
@@ -98,25 +148,53 @@ def test_cli_updates_env(tmp_path, monkeypatch):
     assert "free/model" in env_contents
 
 
-def test_cli_dry_run_does_not_touch_env(tmp_path, monkeypatch):
+def test_cli_dry_run_does_not_touch_env(tmp_path, monkeypatch, fake_selector):
     env_file = tmp_path / ".env"
     args = argparse.Namespace(env_file=str(env_file), update_example=False, dry_run=True)
     selected_model = make_model("free/model", prompt_price="0", completion_price="0")
+    stub_load_models(monkeypatch, [selected_model])
 
-    async def fake_list_free_models(*_, **__):
-        return [selected_model]
+    exit_code = select_openrouter_model.run_cli(args)
+    assert exit_code == 0
+    assert not env_file.exists()
 
-    monkeypatch.setattr(
-        select_openrouter_model.free_model_policy_service,
-        "list_free_models",
-        fake_list_free_models,
+
+def test_cli_reports_load_failure(tmp_path, monkeypatch, capsys, fake_selector):
+    env_file = tmp_path / ".env"
+    args = argparse.Namespace(
+        env_file=str(env_file), update_example=False, dry_run=False, no_cache=True
     )
+
+    async def failing_fetch(*_, **__):
+        raise RuntimeError("catalog unavailable")
+
     monkeypatch.setattr(
-        select_openrouter_model.ModelSelectorApp,
-        "run",
-        lambda self: selected_model,
+        select_openrouter_model.free_model_policy_service, "fetch_models", failing_fetch
     )
 
     exit_code = select_openrouter_model.run_cli(args)
-    assert exit_code == 0
+    assert exit_code == 1
+    assert "Failed to fetch OpenRouter models: catalog unavailable" in capsys.readouterr().err
     assert not env_file.exists()
+
+
+def test_model_cache_round_trip_and_expiry(tmp_path):
+    cache_file = tmp_path / "cache" / "openrouter_models.json"
+    entries = [
+        {
+            "id": "free/model",
+            "name": "Free Model",
+            "pricing": {"prompt": "0", "completion": "0"},
+            "top_provider": {"name": "unit-test", "context_length": 32000},
+        },
+        {"name": "missing id"},
+    ]
+    models = parse_models(entries)
+    assert [m.id for m in models] == ["free/model"]
+
+    select_openrouter_model.save_cached_models(models, cache_file)
+    cached = select_openrouter_model.load_cached_models(cache_file, ttl_seconds=60)
+    assert cached == models
+
+    assert select_openrouter_model.load_cached_models(cache_file, ttl_seconds=-1) is None
+    assert select_openrouter_model.load_cached_models(tmp_path / "missing.json") is None
@@ -0,0 +1,251 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.database import (  # noqa: E402
+    Base,
+    MemoryBlockDB,
+    _ensure_memory_block_indexes,
+    get_db,
+)
+from app.models.schemas import MemoryBlock, MemoryBlockType  # noqa: E402
+from app.routers.memory import router as memory_router  # noqa: E402
+from app.services.memory_service import MemoryConflictError, MemoryService  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def service():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield MemoryService(session)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_upsert_memory_updates_existing_block(service):
+    created = await service.upsert_memory(
+        MemoryBlock(type=MemoryBlockType.PERSONA, key="name", value="first")
+    )
+    updated = await service.upsert_memory(
+        MemoryBlock(
+            type=MemoryBlockType.PERSONA,
+            key="name",
+            value="second",
+            metadata={"source": "test"},
+        )
+    )
+
+    assert updated.id == created.id
+    assert updated.value == "second"
+    assert updated.metadata == {"source": "test"}
+
+    memories = await service.list_memories()
+    assert [m.value for m in memories] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_memory_keeps_types_separate(service):
+    await service.upsert_memory(MemoryBlock(type=MemoryBlockType.PERSONA, key="name", value="a"))
+    await service.upsert_memory(MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key="name", value="b"))
+
+    memories = await service.list_memories()
+    assert sorted(m.value for m in memories) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_search_memories_treats_wildcards_literally(service):
+    await service.create_memory(
+        MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key="discount", value="100% off")
+    )
+    await service.create_memory(
+        MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key="score", value="1000 points")
+    )
+
+    results = await service.search_memories("00%")
+    assert [m.key for m in results] == ["discount"]
+
+    assert await service.search_memories("0_p") == []
+    assert sorted(m.key for m in await service.search_memories("10")) == ["discount", "score"]
+    assert await service.search_memories(" 1 ") == []
+
+
+@pytest.mark.asyncio
+async def test_get_memory_context_groups_by_type(service, monkeypatch):
+    monkeypatch.setattr("app.services.memory_service.CONTEXT_BLOCKS_PER_TYPE", 2)
+    for i in range(3):
+        await service.create_memory(
+            MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key=f"fact{i}", value=f"value {i}")
+        )
+    await service.create_memory(
+        MemoryBlock(type=MemoryBlockType.PERSONA, key="name", value="Ada")
+    )
+
+    context = await service.get_memory_context()
+
+    assert context.splitlines() == [
+        "### Persona",
+        "- **name**: Ada",
+        "",
+        "### Knowledge",
+        "- **fact2**: value 2",
+        "- **fact1**: value 1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_memory_returns_updated_row(service):
+    created = await service.create_memory(
+        MemoryBlock(type=MemoryBlockType.PREFERENCES, key="theme", value="light")
+    )
+
+    updated = await service.update_memory(created.id, value="dark")
+
+    assert updated.id == created.id
+    assert updated.value == "dark"
+    assert updated.updated_at >= created.updated_at
+    assert await service.update_memory("missing-id", value="dark") is None
+
+
+@pytest.mark.asyncio
+async def test_create_memory_with_existing_key_conflicts(service):
+    block = MemoryBlock(type=MemoryBlockType.PERSONA, key="name", value="first")
+    await service.create_memory(block)
+
+    with pytest.raises(MemoryConflictError):
+        await service.create_memory(block.model_copy(update={"value": "second"}))
+
+    # The session is still usable and the original block is untouched
+    assert [m.value for m in await service.list_memories()] == ["first"]
+
+    app = FastAPI()
+    app.include_router(memory_router)
+    app.dependency_overrides[get_db] = lambda: service.db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/memory/", json={"type": "persona", "key": "name", "value": "third"}
+        )
+    assert response.status_code == 409
+    assert "upsert" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_list_memories_keyset_pagination(service):
+    for i in range(3):
+        await service.create_memory(
+            MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key=f"fact{i}", value=f"value {i}")
+        )
+
+    first_page = await service.list_memories(limit=2)
+    assert [m.key for m in first_page] == ["fact2", "fact1"]
+
+    next_page = await service.list_memories(
+        limit=2, cursor=first_page[-1].updated_at, cursor_id=first_page[-1].id
+    )
+    assert [m.key for m in next_page] == ["fact0"]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_does_not_skip_updated_at_ties(service):
+    for i in range(5):
+        await service.create_memory(
+            MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key=f"note{i}", value="tied note")
+        )
+    # Bulk writes can stamp several rows with the same updated_at
+    await service.db.execute(update(MemoryBlockDB).values(updated_at=datetime(2024, 1, 1)))
+
+    for fetch in (
+        lambda **kw: service.list_memories(**kw),
+        lambda **kw: service.search_memories("tied", **kw),
+    ):
+        seen = []
+        page = await fetch(limit=2)
+        while page and len(seen) < 10:
+            seen.extend(m.id for m in page)
+            page = await fetch(limit=2, cursor=page[-1].updated_at, cursor_id=page[-1].id)
+        assert len(seen) == len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+async def test_search_memories_pages_newest_first(service):
+    for i in range(3):
+        await service.create_memory(
+            MemoryBlock(type=MemoryBlockType.KNOWLEDGE, key=f"topic{i}", value="shared note")
+        )
+
+    assert await service.search_memories("   ") == []
+
+    first_page = await service.search_memories("note", limit=2)
+    assert [m.key for m in first_page] == ["topic2", "topic1"]
+
+    next_page = await service.search_memories(
+        "note", limit=2, cursor=first_page[-1].updated_at, cursor_id=first_page[-1].id
+    )
+    assert [m.key for m in next_page] == ["topic0"]
+
+
+OLDER_SCHEMA_DDL = (
+    # memory_blocks as created before the (type, key) unique index existed
+    "CREATE TABLE memory_blocks (id VARCHAR PRIMARY KEY, type VARCHAR(11) NOT NULL, "
+    "key VARCHAR NOT NULL, value TEXT NOT NULL, extra_data JSON, "
+    "created_at DATETIME, updated_at DATETIME)"
+)
+
+
+@pytest.mark.asyncio
+async def test_upsert_works_on_table_from_older_schema():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(OLDER_SCHEMA_DDL))
+        await conn.execute(text(
+            "INSERT INTO memory_blocks VALUES "
+            "('old', 'PERSONA', 'name', 'stale', NULL, '2024-01-01', '2024-01-01')"
+        ))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_ensure_memory_block_indexes)
+        await conn.run_sync(_ensure_memory_block_indexes)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        service = MemoryService(session)
+        updated = await service.upsert_memory(
+            MemoryBlock(type=MemoryBlockType.PERSONA, key="name", value="upserted")
+        )
+        assert updated.id == "old"
+        assert [m.value for m in await service.list_memories()] == ["upserted"]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_index_migration_refuses_to_drop_duplicate_blocks():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(OLDER_SCHEMA_DDL))
+        await conn.execute(text(
+            "INSERT INTO memory_blocks VALUES "
+            "('old', 'PERSONA', 'name', 'stale', NULL, '2024-01-01', '2024-01-01'), "
+            "('new', 'PERSONA', 'name', 'fresh', NULL, '2024-01-02', '2024-01-02')"
+        ))
+
+    with pytest.raises(RuntimeError, match="PERSONA, name"):
+        async with engine.begin() as conn:
+            await conn.run_sync(_ensure_memory_block_indexes)
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT id FROM memory_blocks ORDER BY id"))).all()
+    assert [row.id for row in rows] == ["new", "old"]
+    await engine.dispose()
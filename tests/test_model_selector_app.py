@@ -0,0 +1,132 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.free_model_policy import OpenRouterModel  # noqa: E402
+from scripts.model_selector_app import ModelSelectorApp  # noqa: E402
+
+
+def make_catalog(count: int = 900) -> list[OpenRouterModel]:
+    models = []
+    for i in range(count):
+        price = "0" if i % 3 else str(i / 1e6)
+        models.append(
+            OpenRouterModel(
+                id=f"prov/model-{i:04d}",
+                name=f"Model {i}",
+                pricing={"prompt": price, "completion": price},
+                provider="Prov" if i % 2 else "Other",
+                context_length=1000 * (i % 300),
+                description="unit test model",
+                raw={},
+            )
+        )
+    return models
+
+
+def table_row_ids(app: ModelSelectorApp) -> list[str]:
+    table = app.query_one("#models")
+    return [table.coordinate_to_cell_key((row, 0)).row_key.value for row in range(table.row_count)]
+
+
+def assert_table_matches_filtered(app: ModelSelectorApp) -> None:
+    shown = table_row_ids(app)
+    assert shown, "table should not be empty"
+    assert shown == [model.id for model in app._filtered_models[: len(shown)]]
+    assert shown == app._row_ids
+
+
+async def wait_for_search(app: ModelSelectorApp, pilot) -> None:
+    while app._search_timer is not None:
+        await pilot.pause(0.05)
+
+
+@pytest.mark.asyncio
+async def test_table_rows_follow_filtered_models():
+    app = ModelSelectorApp(make_catalog())
+    async with app.run_test(size=(160, 40)) as pilot:
+        await pilot.pause()
+        assert_table_matches_filtered(app)
+
+        # Sort, filter and tab changes reuse rows through _sync_rows
+        for key in ("s", "s", "s", "l", "p", "s", "l", "f"):
+            await pilot.press(key)
+            await pilot.pause()
+            assert_table_matches_filtered(app)
+
+        await pilot.press("/", *"model-00")
+        await wait_for_search(app, pilot)
+        assert_table_matches_filtered(app)
+        await pilot.press("backspace")
+        await wait_for_search(app, pilot)
+        assert_table_matches_filtered(app)
+        await pilot.press("enter")
+
+        # Moving past the loaded rows appends more through _fill_visible_rows
+        table = app._table
+        table.focus()
+        loaded = table.row_count
+        table.move_cursor(row=loaded - 1)
+        await pilot.press("down")
+        await pilot.pause()
+        assert table.row_count > loaded
+        assert_table_matches_filtered(app)
+
+
+def test_trigram_search_matches_linear_scan():
+    app = ModelSelectorApp(make_catalog())
+    cls = type(app)
+    rng = random.Random(0)
+    queries = ["model-01", "prov/m", "other", "l 1", "xyz", "del-0", "odel 2", "zz"]
+    queries += [
+        "".join(rng.choice("model-0123 prov/") for _ in range(rng.randint(3, 6)))
+        for _ in range(30)
+    ]
+
+    for tab in ("free", "paid"):
+        for mode in ("context", "price_asc", "price_desc"):
+            for long_context in (False, True):
+                # Set reactives without watchers; the app is not mounted
+                app.set_reactive(cls.active_tab, tab)
+                app.set_reactive(cls.sort_mode, mode)
+                app.set_reactive(cls.filter_long_context, long_context)
+                for query in queries:
+                    app._search_query = query
+                    expected = [
+                        model for model, haystack in app._sorted_models() if query in haystack
+                    ]
+                    assert app._apply_filters() == expected, (tab, mode, long_context, query)
+
+
+@pytest.mark.asyncio
+async def test_loader_populates_table_after_mount():
+    catalog = make_catalog(60)
+
+    async def loader():
+        return catalog
+
+    app = ModelSelectorApp(loader=loader)
+    async with app.run_test(size=(160, 40)) as pilot:
+        while app._loader is not None:
+            await pilot.pause(0.05)
+        assert app.load_error is None
+        assert_table_matches_filtered(app)
+
+
+@pytest.mark.asyncio
+async def test_loader_failure_exits_with_error():
+    async def loader():
+        raise RuntimeError("catalog unavailable")
+
+    app = ModelSelectorApp(loader=loader)
+    async with app.run_test() as pilot:
+        await pilot.pause(0.2)
+
+    assert app.load_error == "Failed to fetch OpenRouter models: catalog unavailable"
+    assert app.return_value is None
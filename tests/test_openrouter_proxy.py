@@ -0,0 +1,123 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts import openrouter_proxy  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    ("path", "method", "content_type", "expected"),
+    [
+        ("v1/chat/completions", "POST", "application/json", True),
+        ("v1/completions", "POST", "application/json", True),
+        ("v1/messages/count_tokens", "POST", "application/json; charset=utf-8", True),
+        ("v1/messages", "POST", "", True),
+        ("v1/embeddings", "POST", "application/vnd.api+json", True),
+        ("v1/files", "POST", "multipart/form-data; boundary=x", False),
+        ("v1/models", "GET", "application/json", False),
+    ],
+)
+def test_should_rewrite(path, method, content_type, expected):
+    assert openrouter_proxy._should_rewrite(path, method, content_type) is expected
+
+
+@pytest_asyncio.fixture
+async def proxy_client(monkeypatch):
+    """Drive the proxy app against a mock upstream and record what it receives."""
+    upstream_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(openrouter_proxy.app.state, "client", upstream, raising=False)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=openrouter_proxy.app), base_url="http://proxy"
+    )
+    yield client, upstream_requests
+    await upstream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_model_bearing_posts_get_the_free_model(proxy_client):
+    client, upstream_requests = proxy_client
+
+    async with client:
+        for path in ("/v1/completions", "/v1/messages/count_tokens"):
+            response = await client.post(path, json={"model": "anthropic/claude-sonnet"})
+            assert response.status_code == 200
+        await client.post(
+            "/v1/files", content=b'{"model": "anthropic/claude-sonnet"}',
+            headers={"content-type": "text/plain"},
+        )
+
+    rewritten = [json.loads(request.content)["model"] for request in upstream_requests[:2]]
+    assert rewritten == [openrouter_proxy.FORCE_MODEL] * 2
+    # Non-JSON uploads to other endpoints are passed through untouched
+    assert upstream_requests[2].content == b'{"model": "anthropic/claude-sonnet"}'
+
+
+@pytest.mark.asyncio
+async def test_streaming_upstream_closed_when_client_disconnects_early(monkeypatch):
+    closed = []
+
+    class UpstreamStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"data: hi\n\n"
+
+        async def aclose(self):
+            closed.append(True)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=UpstreamStream()
+        )
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(openrouter_proxy.app.state, "client", upstream, raising=False)
+
+    body = json.dumps({"model": "anthropic/claude-sonnet", "stream": True}).encode()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # A slow client: the disconnect lands while the headers are still being sent,
+        # so the response body generator is never entered
+        if message["type"] == "http.response.start":
+            await asyncio.sleep(0.5)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/chat/completions",
+        "raw_path": b"/v1/chat/completions",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 1),
+        "server": ("proxy", 80),
+    }
+    await openrouter_proxy.app(scope, receive, send)
+    await upstream.aclose()
+
+    assert closed
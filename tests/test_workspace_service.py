@@ -0,0 +1,131 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.workspace_service import WorkspaceService  # noqa: E402
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("print('hi')\n")
+    (tmp_path / "src" / "pkg" / "util.py").write_text("x = 1\n")
+    (tmp_path / "README.md").write_text("# readme\n")
+    (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+    (tmp_path / "node_modules" / "dep" / "index.js").write_text("module.exports = 1;\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    return WorkspaceService(str(tmp_path))
+
+
+def test_workspace_stats_skip_hidden_and_dependency_dirs(workspace):
+    stats = workspace.get_workspace_stats()
+
+    assert stats["total_files"] == 3
+    assert stats["total_directories"] == 2
+    assert stats["total_size_bytes"] == len("print('hi')\n") + len("x = 1\n") + len("# readme\n")
+
+
+def test_workspace_stats_count_symlinks_by_target(workspace):
+    src = workspace.workspace_path / "src"
+    (src / "alias.py").symlink_to(src / "main.py")
+    (src / "linked").symlink_to(src / "pkg", target_is_directory=True)
+    (src / "dangling").symlink_to(src / "missing.txt")
+
+    stats = workspace.get_workspace_stats()
+
+    # alias.py counts as a file and linked as a directory; linked/util.py is not counted twice
+    assert stats["total_files"] == 4
+    assert stats["total_directories"] == 3
+    assert stats["total_size_bytes"] == (
+        2 * len("print('hi')\n") + len("x = 1\n") + len("# readme\n")
+    )
+
+
+def test_file_tree_lists_children_with_relative_paths(workspace):
+    tree = workspace.get_file_tree(max_depth=2)
+
+    assert tree.path == "."
+    children = {child.name: child for child in tree.children}
+    assert set(children) == {"README.md", "node_modules", "src"}
+    assert children["node_modules"].children == []
+    assert children["README.md"].size == len("# readme\n")
+
+    src_children = {child.name: child for child in children["src"].children}
+    assert src_children["main.py"].path == "src/main.py"
+    assert src_children["pkg"].is_directory
+    assert src_children["pkg"].children is None
+
+
+def test_resolve_path_rejects_escapes(workspace, tmp_path):
+    assert workspace._resolve_path(".") == workspace.workspace_path
+    assert workspace._resolve_path("src/../src/pkg") == workspace.workspace_path / "src" / "pkg"
+
+    sibling = tmp_path.parent / (tmp_path.name + "-sibling")
+    for path in ("..", "../" + sibling.name, "/etc"):
+        with pytest.raises(ValueError):
+            workspace._resolve_path(path)
+
+
+def test_resolve_path_rejects_symlinks_out_of_workspace(workspace, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "secret.txt").write_text("secret\n")
+    (workspace.workspace_path / "src" / "link").symlink_to(outside, target_is_directory=True)
+
+    with pytest.raises(ValueError):
+        workspace._resolve_path("src/link/secret.txt")
+
+
+def test_symlinks_report_their_target_type_and_size(workspace, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "secret.txt").write_text("secret\n")
+    src = workspace.workspace_path / "src"
+    (src / "linked").symlink_to(src / "pkg", target_is_directory=True)
+    (src / "alias.py").symlink_to(src / "main.py")
+    (src / "escape").symlink_to(outside, target_is_directory=True)
+    (src / "dangling").symlink_to(src / "missing.txt")
+
+    files = {f.name: f for f in workspace.list_files(path="src")}
+    assert files["linked"].is_directory and files["linked"].size is None
+    assert files["alias.py"].size == len("print('hi')\n")
+    assert files["escape"].is_directory
+    assert not files["dangling"].is_directory and files["dangling"].size is None
+
+    tree = workspace.get_file_tree(path="src", max_depth=2)
+    children = {child.name: child for child in tree.children}
+    assert [child.name for child in children["linked"].children] == ["util.py"]
+    assert children["escape"].children is None
+
+
+def test_file_tree_orders_dirs_first_and_truncates(workspace, monkeypatch):
+    monkeypatch.setattr("app.services.workspace_service.MAX_TREE_CHILDREN", 2)
+    for name in ("b.txt", "A.txt", "c.txt"):
+        (workspace.workspace_path / "src" / "pkg" / name).write_text(name)
+
+    tree = workspace.get_file_tree(path="src", max_depth=2)
+
+    assert [child.name for child in tree.children] == ["pkg", "main.py"]
+    pkg_children = tree.children[0].children
+    assert [child.name for child in pkg_children] == ["A.txt", "b.txt", "... 2 more"]
+    placeholder = pkg_children[-1]
+    assert placeholder.omitted_count == 2
+    assert placeholder.path not in {tree.children[0].path, *(c.path for c in pkg_children[:-1])}
+    assert all(child.omitted_count is None for child in pkg_children[:-1])
+
+
+def test_list_files_recursive_pattern_skips_hidden(workspace):
+    (workspace.workspace_path / ".git" / "hook.py").write_text("")
+
+    files = workspace.list_files(recursive=True, pattern="*.py")
+    assert sorted(f.path for f in files) == ["src/main.py", "src/pkg/util.py"]
+
+    nested = workspace.list_files(recursive=True, pattern="pkg/*.py")
+    assert [f.path for f in nested] == ["src/pkg/util.py"]
+
+    top_level = workspace.list_files(path="src")
+    assert [f.name for f in top_level] == ["pkg", "main.py"]